@@ -11,11 +11,17 @@ Example Kafka message format:
 # Import Modules
 #####################################
 
-import os
+import re
 import json
-from collections import deque
+import math
+from typing import Optional
+
+import numpy as np
+import orjson
+from numba import njit
 from dotenv import load_dotenv
 
+from utils.utils_config_mk import MKConfig
 from utils.utils_consumer import create_kafka_consumer
 from utils.utils_logger import logger
 
@@ -26,83 +32,178 @@ from utils.utils_logger import logger
 load_dotenv()
 
 #####################################
-# Getter Functions for .env Variables
+# Polling Configuration
 #####################################
 
-def get_kafka_topic() -> str:
-    """Fetch Kafka topic from environment or use default."""
-    topic = os.getenv("MK_TOPIC", "unknown_topic")
-    logger.info(f"[MK] Kafka topic: {topic}")
-    return topic
+POLL_TIMEOUT_MS = 500
+POLL_MAX_RECORDS = 500
+
+#####################################
+# Stall Detection Kernel
+#####################################
 
-def get_kafka_consumer_group_id() -> str:
-    """Fetch Kafka consumer group id from environment or use default."""
-    group_id = os.getenv("MK_CONSUMER_GROUP_ID", "mk_default_group")
-    logger.info(f"[MK] Kafka consumer group id: {group_id}")
-    return group_id
+@njit(cache=True, fastmath=True)
+def process_batch(
+    temps: np.ndarray,
+    window: np.ndarray,
+    cursor: int,
+    filled: int,
+    window_size: int,
+    threshold: float,
+) -> tuple[int, int, np.ndarray]:
+    """
+    Push a batch of readings through the ring buffer and flag stalls.
 
-def get_stall_threshold() -> float:
-    """Fetch message interval from environment or use default."""
-    threshold = float(os.getenv("MK_STALL_THRESHOLD_F", 0.2))
-    logger.info(f"[MK] Max stall temperature range: {threshold} F")
-    return threshold
+    Compiled by numba; the first call pays the JIT cost (cached on disk).
 
-def get_rolling_window_size() -> int:
-    """Fetch rolling window size from environment or use default."""
-    window_size = int(os.getenv("MK_ROLLING_WINDOW_SIZE", 5))
-    logger.info(f"[MK] Rolling window size: {window_size}")
-    return window_size
+    Returns:
+        tuple: Updated cursor, updated fill count, and a bool array with
+        one stall flag per reading in temps.
+    """
+    stalled = np.zeros(temps.shape[0], dtype=np.bool_)
+    for k in range(temps.shape[0]):
+        window[cursor] = temps[k]
+        cursor = (cursor + 1) % window_size
+        if filled < window_size:
+            filled += 1
+        if filled == window_size:
+            lo = window[0]
+            hi = window[0]
+            for v in window[1:]:
+                lo = min(lo, v)
+                hi = max(hi, v)
+            stalled[k] = hi - lo <= threshold
+    return cursor, filled, stalled
 
 #####################################
-# Stall Detection
+# Rolling Window
 #####################################
 
-def detect_stall(rolling_window_deque: deque) -> bool:
-    """Detect temperature stall using rolling window."""
-    WINDOW_SIZE = get_rolling_window_size()
-    if len(rolling_window_deque) < WINDOW_SIZE:
-        logger.debug(f"[MK] Rolling window not full: {len(rolling_window_deque)}/{WINDOW_SIZE}")
-        return False
+class RollingWindow:
+    """
+    Fixed-size rolling window backed by a preallocated numpy ring buffer.
+
+    New readings overwrite the oldest slot at the cursor, so the buffer
+    holds the last window_size readings (in rotated order) once filled.
+    """
+
+    window_size: int
+    values: np.ndarray
+    cursor: int
+    filled: int
+
+    def __init__(self, window_size: int) -> None:
+        self.window_size = window_size
+        self.values = np.empty(window_size, dtype=np.float64)
+        self.cursor = 0
+        self.filled = 0
+
+    def __len__(self) -> int:
+        return self.filled
 
-    temp_range = max(rolling_window_deque) - min(rolling_window_deque)
-    is_stalled = temp_range <= get_stall_threshold()
-    logger.debug(f"[MK] Temp range: {temp_range}°F. Stalled: {is_stalled}")
-    return is_stalled
+    def extend(self, temps: np.ndarray, stall_threshold: float) -> np.ndarray:
+        """Add a batch of readings and return the per-reading stall flags."""
+        self.cursor, self.filled, stalled = process_batch(
+            temps, self.values, self.cursor, self.filled, self.window_size, stall_threshold
+        )
+        return stalled
 
 #####################################
 # Message Processing
+#
+# Per-message debug/info logs pass their values as arguments
+# instead of f-strings so loguru only formats records it will emit.
 #####################################
 
-def process_message(message: str, rolling_window: deque, window_size: int) -> None:
-    """Process a Kafka JSON message and detect temperature stalls."""
+# Fixed two-field schema from the MK producer: pull the fields out directly
+# and only fall back to a full JSON parse when either pattern misses.
+_TEMP_RE = re.compile(rb'"temperature"\s*:\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)(?=\s*[,}])')
+# Escapes are matched as a unit so an escaped quote can't end the string early;
+# any timestamp containing one is left to orjson to decode.
+_TS_RE = re.compile(rb'"timestamp"\s*:\s*"((?:[^"\\]|\\.)+)"')
+
+def parse_message(message: bytes) -> Optional[tuple[str, float]]:
+    """Parse a Kafka JSON message into (timestamp, temperature), or None if invalid."""
     try:
-        logger.debug(f"[MK] Raw message: {message}")
-        data = json.loads(message)
-        temperature = data.get("temperature")
-        timestamp = data.get("timestamp")
+        logger.debug("[MK] Raw message: {}", message)
+        temp_match = _TEMP_RE.search(message)
+        ts_match = _TS_RE.search(message)
+        raw_ts = ts_match.group(1) if ts_match is not None else None
+        if (
+            temp_match is not None
+            and raw_ts is not None
+            and b"\\" not in raw_ts
+            and raw_ts.isascii()
+        ):
+            timestamp: str = raw_ts.decode("ascii")
+            temperature: float = float(temp_match.group(1))
+            logger.info("[MK] Processed message: {} {}°F", timestamp, temperature)
+        else:
+            data: dict = orjson.loads(message)
+            logger.info("[MK] Processed message: {}", data)
+            raw_timestamp = data["timestamp"]
+            if not isinstance(raw_timestamp, str):
+                logger.error(f"[MK] Non-string timestamp in message: {message!r}")
+                return None
+            timestamp = raw_timestamp
+            raw_temperature = data["temperature"]
+            # Only JSON numbers: float("nan") etc. would accept string temperatures
+            if isinstance(raw_temperature, bool) or not isinstance(
+                raw_temperature, (int, float)
+            ):
+                logger.error(f"[MK] Non-numeric temperature in message: {message!r}")
+                return None
+            temperature = float(raw_temperature)
 
-        logger.info(f"[MK] Processed message: {data}")
+        # The stall kernel is compiled with fastmath, which assumes finite values
+        if not math.isfinite(temperature):
+            logger.error(f"[MK] Non-finite temperature in message: {message!r}")
+            return None
+        return timestamp, temperature
 
-        if temperature is None or timestamp is None:
-            logger.error(f"[MK] Invalid message: {message}")
-            return
+    except (orjson.JSONDecodeError, json.JSONDecodeError) as e:
+        logger.error(f"[MK] JSON decode error: {e}")
+    except KeyError as e:
+        logger.error(f"[MK] Missing field {e} in message: {message!r}")
+    except TypeError as e:
+        logger.error(f"[MK] Invalid message {message!r}: {e}")
+    except Exception as e:
+        logger.error(f"[MK] Unexpected error: {e}")
+    return None
 
-        rolling_window.append(temperature)
+def process_messages(
+    messages: list[bytes], rolling_window: RollingWindow, config: MKConfig
+) -> None:
+    """Process a batch of Kafka JSON messages and detect temperature stalls."""
+    timestamps: list[str] = []
+    temperatures: list[float] = []
+    for message in messages:
+        parsed = parse_message(message)
+        if parsed is None:
+            continue
+        timestamp, temperature = parsed
 
         # High temperature warning
-        if temperature > 300:
+        if temperature > config.high_temp_threshold:
             logger.warning(f"[MK] HIGH TEMP ALERT at {timestamp}: {temperature}°F")
 
-        # Stall detection
-        if detect_stall(rolling_window):
-            logger.info(
-                f"[MK] STALL DETECTED at {timestamp}: Temp stable at {temperature}°F over last {window_size} readings."
-            )
+        timestamps.append(timestamp)
+        temperatures.append(temperature)
 
-    except json.JSONDecodeError as e:
-        logger.error(f"[MK] JSON decode error: {e}")
-    except Exception as e:
-        logger.error(f"[MK] Unexpected error: {e}")
+    if not temperatures:
+        return
+
+    # Stall detection for the whole batch in one compiled call
+    stalled = rolling_window.extend(
+        np.array(temperatures, dtype=np.float64), config.stall_threshold
+    )
+    for k in np.flatnonzero(stalled):
+        logger.info(
+            "[MK] STALL DETECTED at {}: Temp stable at {}°F over last {} readings.",
+            timestamps[k],
+            temperatures[k],
+            rolling_window.window_size,
+        )
 
 #####################################
 # Main Function
@@ -111,19 +212,34 @@ def process_message(message: str, rolling_window: deque, window_size: int) -> No
 def main() -> None:
     """Start MK Kafka consumer and process messages."""
     logger.info("[MK] START consumer.")
-    topic = get_kafka_topic()
-    group_id = get_kafka_consumer_group_id()
-    window_size = get_rolling_window_size()
-    logger.info(f"[MK] Listening on topic '{topic}' with group ID '{group_id}'")
+    # Read once here; these never change while consuming
+    config = MKConfig.load()
+    topic = config.topic
+    logger.info(f"[MK] Listening on topic '{topic}' with group ID '{config.group_id}'")
 
-    rolling_window = deque(maxlen=window_size)
-    consumer = create_kafka_consumer(topic, group_id)
+    # One window per message key (sensor), so readings from different
+    # sensors sharing a partition never mix in the same window
+    rolling_windows: dict[Optional[bytes], RollingWindow] = {}
+    # Keep raw bytes: orjson parses them directly, no str decode needed
+    consumer = create_kafka_consumer(
+        topic, config.group_id, value_deserializer_provided=lambda x: x
+    )
 
     try:
-        for message in consumer:
-            message_str = message.value
-            logger.debug(f"[MK] Received message at offset {message.offset}: {message_str}")
-            process_message(message_str, rolling_window, window_size)
+        while True:
+            # Pull records in batches to spread per-call overhead;
+            # offsets are still committed by the consumer's auto-commit.
+            batch = consumer.poll(timeout_ms=POLL_TIMEOUT_MS, max_records=POLL_MAX_RECORDS)
+            for records in batch.values():
+                messages_by_key: dict[Optional[bytes], list[bytes]] = {}
+                for message in records:
+                    messages_by_key.setdefault(message.key, []).append(message.value)
+                for key, messages in messages_by_key.items():
+                    rolling_window = rolling_windows.get(key)
+                    if rolling_window is None:
+                        rolling_window = RollingWindow(config.window_size)
+                        rolling_windows[key] = rolling_window
+                    process_messages(messages, rolling_window, config)
     except KeyboardInterrupt:
         logger.warning("[MK] Consumer interrupted.")
     except Exception as e:
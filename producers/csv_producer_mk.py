@@ -8,13 +8,14 @@ each field is clearly labeled.
 """
 
 # Standard Library
-import os
 import sys
 import time
 import pathlib
-import csv
-import json
-from datetime import datetime
+import math
+import mmap
+import queue
+import threading
+from typing import Iterator
 
 # Add project root to sys.path
 PROJECT_ROOT = pathlib.Path(__file__).parent.parent
@@ -24,92 +25,192 @@ sys.path.append(str(PROJECT_ROOT))
 from dotenv import load_dotenv
 
 # Internal Imports
+from utils.utils_config_mk import MKConfig
 from utils.utils_logger import logger
 from utils.utils_producer import (
     verify_services,
-    create_kafka_producer,
+    create_confluent_producer,
     create_kafka_topic,
 )
 
 # Load environment variables
 load_dotenv()
 
-def get_kafka_topic() -> str:
-    topic = os.getenv("SMOKER_TOPIC", "unknown_topic")
-    logger.info(f"Kafka topic: {topic}")
-    return topic
-
-def get_message_interval() -> int:
-    interval = int(os.getenv("SMOKER_INTERVAL_SECONDS", 1))
-    logger.info(f"Message interval: {interval} seconds")
-    return interval
-
 # Use your custom data file
 DATA_FILE = PROJECT_ROOT / "data" / "mk_temps.csv"
 logger.info(f"Data file: {DATA_FILE}")
 
-def generate_messages(file_path: pathlib.Path):
+# Fixed JSON layout of each message (timestamp, temperature)
+MESSAGE_TEMPLATE = b'{"timestamp":"%b","temperature":%b}'
+
+# Date part of the timestamp only changes once a day, so cache it
+_cached_day = -1
+_cached_date_prefix = ""
+
+def utc_timestamp() -> str:
     """
-    Read each row from the CSV file and yield a structured message.
+    Return the current UTC time as an ISO 8601 string, e.g. 2025-01-11T18:15:00.123456Z.
+
+    Only the time of day is formatted per call, using integer math on time_ns().
     """
-    while True:
-        try:
-            logger.info(f"Opening data file in read mode: {file_path}")
-            with open(file_path, "r") as csv_file:
-                csv_reader = csv.DictReader(csv_file)
-                for row in csv_reader:
-                    if "temperature" not in row:
+    global _cached_day, _cached_date_prefix
+    secs, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    day, secs_of_day = divmod(secs, 86400)
+    if day != _cached_day:
+        _cached_date_prefix = time.strftime("%Y-%m-%dT", time.gmtime(secs))
+        _cached_day = day
+    hours, rem = divmod(secs_of_day, 3600)
+    minutes, seconds = divmod(rem, 60)
+    return f"{_cached_date_prefix}{hours:02}:{minutes:02}:{seconds:02}.{micros:06}Z"
+
+def build_message(temperature: float) -> bytes:
+    """
+    Return a JSON-encoded message (bytes) for a reading, timestamped now.
+
+    Fills the JSON template directly: no per-row dict, and the
+    producer can hand the bytes straight to librdkafka.
+    """
+    return MESSAGE_TEMPLATE % (
+        utc_timestamp().encode("ascii"),
+        repr(temperature).encode("ascii"),
+    )
+
+def read_temperatures(file_path: pathlib.Path) -> Iterator[float]:
+    """
+    Replay the CSV file forever, yielding the temperature from each row.
+
+    The file is memory-mapped once and rewound on each pass instead of being reopened.
+    Timestamps are added later by build_message(), at send time.
+    """
+    try:
+        logger.info(f"Mapping data file into memory: {file_path}")
+        with open(file_path, "rb") as csv_file, mmap.mmap(
+            csv_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            # Find the temperature column once from the header
+            header = mm.readline().rstrip(b"\r\n").split(b",")
+            if b"temperature" not in header:
+                logger.error(f"No temperature column in {file_path}. Exiting.")
+                sys.exit(1)
+            temp_idx = header.index(b"temperature")
+
+            while True:
+                rows_read = 0
+                for line in iter(mm.readline, b""):
+                    # Skip blank lines silently, as csv.DictReader did
+                    if not line.strip():
+                        continue
+                    row = line.rstrip(b"\r\n").split(b",")
+                    if len(row) <= temp_idx:
                         logger.warning(f"Missing temperature in row: {row}")
                         continue
-                    message = {
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "temperature": float(row["temperature"])
-                    }
-                    logger.debug(f"Generated message: {message}")
-                    yield message
-        except FileNotFoundError:
-            logger.error(f"File not found: {file_path}. Exiting.")
-            sys.exit(1)
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            sys.exit(3)
+                    temperature = float(row[temp_idx])
+                    if not math.isfinite(temperature):
+                        logger.warning(f"Non-numeric temperature in row: {row}")
+                        continue
+                    rows_read += 1
+                    yield temperature
+
+                if rows_read == 0:
+                    logger.error(f"No data rows in {file_path}. Exiting.")
+                    sys.exit(1)
+                # Rewind and skip the header for the next pass
+                mm.seek(0)
+                mm.readline()
+    except FileNotFoundError:
+        logger.error(f"File not found: {file_path}. Exiting.")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        sys.exit(3)
+
+# Max readings parsed ahead of the send loop. Kept small: the data file is
+# tiny and page-cached, so deeper read-ahead only adds memory, not speed.
+PREFETCH_QUEUE_SIZE = 8
+_PREFETCH_DONE = object()
+
+def prefetch(readings: Iterator[float], maxsize: int = PREFETCH_QUEUE_SIZE) -> Iterator[float]:
+    """
+    Drain a readings generator on a background thread through a bounded queue.
+
+    Lets CSV parsing overlap with producing. Only raw readings are queued;
+    messages are timestamped and serialized by the caller at send time.
+    Exceptions raised by the generator (including SystemExit) are
+    re-raised in the caller's thread.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=maxsize)
+
+    def fill() -> None:
+        try:
+            for item in readings:
+                buffer.put(item)
+            buffer.put(_PREFETCH_DONE)
+        except BaseException as e:
+            buffer.put(e)
+
+    threading.Thread(target=fill, name="mk-csv-reader", daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is _PREFETCH_DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
 
 def main():
     logger.info("START producer.")
     verify_services()
 
-    topic = get_kafka_topic()
-    interval_secs = get_message_interval()
+    config = MKConfig.load()
+    topic = config.topic
 
     if not DATA_FILE.exists():
         logger.error(f"Data file not found: {DATA_FILE}. Exiting.")
         sys.exit(1)
 
-    producer = create_kafka_producer(
-        value_serializer=lambda x: json.dumps(x).encode("utf-8")
-    )
-    if not producer:
+    producer = create_confluent_producer()
+    # Producer defines __len__ (queued messages), so test for None explicitly
+    if producer is None:
         logger.error("Kafka producer could not be created. Exiting...")
         sys.exit(3)
 
     try:
-        create_kafka_topic(topic)
+        # Reuse a matching topic so other sensors' producers don't wipe each other's data
+        create_kafka_topic(topic, num_partitions=config.partitions, recreate=False)
     except Exception as e:
         logger.error(f"Error managing topic '{topic}': {e}")
         sys.exit(1)
 
     try:
-        for message in generate_messages(DATA_FILE):
-            producer.send(topic, value=message)
-            logger.info(f"Sent: {message}")
-            time.sleep(interval_secs)
+        # Key by sensor so each sensor's readings stay in order on one partition
+        key = config.sensor_id.encode("utf-8")
+        # Sleep until fixed deadlines so send time doesn't stretch the period
+        interval_secs = config.interval
+        next_deadline = time.monotonic()
+        for temperature in prefetch(read_temperatures(DATA_FILE)):
+            payload = build_message(temperature)
+            logger.debug("Generated message: {}", payload)
+            while True:
+                try:
+                    producer.produce(topic, key=key, value=payload)
+                    break
+                except BufferError:
+                    # Local queue is full: serve deliveries until there is room
+                    producer.poll(0.5)
+            producer.poll(0)
+            logger.info("Sent: {}", payload)
+            if interval_secs > 0:
+                next_deadline += interval_secs
+                sleep_for = next_deadline - time.monotonic()
+                if sleep_for > 0:
+                    time.sleep(sleep_for)
     except KeyboardInterrupt:
         logger.warning("Producer interrupted by user.")
     except Exception as e:
         logger.error(f"Unexpected error during production: {e}")
     finally:
-        producer.close()
-        logger.info("Kafka producer closed.")
+        producer.flush()
+        logger.info("Kafka producer flushed.")
         logger.info("END producer.")
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+"""
+utils_config_mk.py - settings shared by the MK CSV producer and consumer.
+
+Values come from the environment (.env) and are read once into a
+frozen MKConfig, so hot loops use plain attribute access instead of
+repeated os.getenv() lookups and conversions.
+"""
+
+#####################################
+# Import Modules
+#####################################
+
+# Import packages from Python Standard Library
+import os
+from dataclasses import dataclass
+
+# Import functions from local modules
+from utils.utils_logger import logger
+
+#####################################
+# Config Dataclass
+#####################################
+
+
+@dataclass(frozen=True, slots=True)
+class MKConfig:
+    """Immutable MK settings, loaded once at startup."""
+
+    topic: str
+    group_id: str
+    sensor_id: str
+    partitions: int
+    window_size: int
+    stall_threshold: float
+    high_temp_threshold: float
+    interval: float
+
+    @classmethod
+    def load(cls) -> "MKConfig":
+        """Read MK settings from the environment, using defaults where unset."""
+        config = cls(
+            topic=os.getenv("MK_TOPIC", "unknown_topic"),
+            group_id=os.getenv("MK_CONSUMER_GROUP_ID", "mk_default_group"),
+            sensor_id=os.getenv("MK_SENSOR_ID", "mk_smoker"),
+            partitions=int(os.getenv("MK_PARTITIONS", 1)),
+            window_size=int(os.getenv("MK_ROLLING_WINDOW_SIZE", 5)),
+            stall_threshold=float(os.getenv("MK_STALL_THRESHOLD_F", 0.2)),
+            high_temp_threshold=float(os.getenv("MK_HIGH_TEMP_THRESHOLD", 300)),
+            interval=float(os.getenv("MK_INTERVAL_SECONDS", 1)),
+        )
+        logger.info(f"[MK] Config: {config}")
+        return config
@@ -9,7 +9,7 @@ Consumers subscribe to a topic and read messages from the Kafka topic.
 #####################################
 
 # Import packages from Python Standard Library
-from typing import Optional, Callable
+from typing import Any, Callable, Optional
 
 # Import external packages
 from kafka import KafkaConsumer
@@ -33,7 +33,7 @@ DEFAULT_CONSUMER_GROUP = "test_group"
 def create_kafka_consumer(
     topic_provided: Optional[str] = None,
     group_id_provided: Optional[str] = None,
-    value_deserializer_provided: Optional[Callable[[bytes], str]] = None,
+    value_deserializer_provided: Optional[Callable[[bytes], Any]] = None,
 ):
     """
     Create and return a Kafka consumer instance.
@@ -61,7 +61,7 @@ def create_kafka_consumer(
 
     consumer_group_id = (group_id_provided or DEFAULT_CONSUMER_GROUP).strip()
 
-    value_deserializer: Callable[[bytes], str] = value_deserializer_provided or (
+    value_deserializer: Callable[[bytes], Any] = value_deserializer_provided or (
         lambda x: x.decode("utf-8")
     )
 
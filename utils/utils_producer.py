@@ -15,6 +15,7 @@ import time
 from typing import Callable, Optional, Any
 
 # Import external packages
+from confluent_kafka import Producer as ConfluentProducer
 from dotenv import load_dotenv
 from kafka import KafkaProducer, errors
 from kafka.admin import (
@@ -32,6 +33,13 @@ from utils.utils_logger import logger
 
 DEFAULT_KAFKA_BROKER_ADDRESS = "localhost:9092"
 
+# librdkafka batching defaults for high-throughput producers
+DEFAULT_CONFLUENT_PRODUCER_CONFIG = {
+    "linger.ms": 50,
+    "batch.num.messages": 10000,
+    "compression.type": "lz4",
+}
+
 #####################################
 # Helper Functions
 #####################################
@@ -117,6 +125,39 @@ def create_kafka_producer(
         return None
 
 
+def create_confluent_producer(
+    config_overrides: Optional[dict] = None,
+) -> Optional[ConfluentProducer]:
+    """
+    Create and return a confluent-kafka (librdkafka) producer instance.
+
+    Messages are batched in librdkafka's background thread, so values
+    must already be bytes when passed to produce(). Call poll(0)
+    regularly to serve delivery callbacks and flush() before exiting.
+
+    Args:
+        config_overrides (dict, optional): librdkafka settings that replace
+            the defaults in DEFAULT_CONFLUENT_PRODUCER_CONFIG.
+
+    Returns:
+        confluent_kafka.Producer: Configured producer instance.
+    """
+    kafka_broker = get_kafka_broker_address()
+
+    config = {"bootstrap.servers": kafka_broker, **DEFAULT_CONFLUENT_PRODUCER_CONFIG}
+    if config_overrides:
+        config.update(config_overrides)
+
+    try:
+        logger.info(f"Connecting to Kafka broker at {kafka_broker} (librdkafka)...")
+        producer = ConfluentProducer(config)
+        logger.info("Kafka producer successfully created.")
+        return producer
+    except Exception as e:
+        logger.error(f"Failed to create Kafka producer: {e}")
+        return None
+
+
 def _topic_exists(admin: KafkaAdminClient, topic_name: str) -> bool:
     try:
         return topic_name in set(admin.list_topics())
@@ -125,6 +166,17 @@ def _topic_exists(admin: KafkaAdminClient, topic_name: str) -> bool:
         return False
 
 
+def _topic_partition_count(admin: KafkaAdminClient, topic_name: str) -> Optional[int]:
+    """Return the topic's partition count, or None if it cannot be determined."""
+    try:
+        for topic in admin.describe_topics([topic_name]):
+            if topic.get("topic") == topic_name and not topic.get("error_code"):
+                return len(topic.get("partitions", []))
+    except Exception as e:
+        logger.warning(f"Could not describe topic '{topic_name}': {e}")
+    return None
+
+
 def _delete_topic_if_exists(admin: KafkaAdminClient, topic_name: str) -> None:
     """Delete topic if present and wait briefly for deletion to complete."""
     try:
@@ -141,7 +193,9 @@ def _delete_topic_if_exists(admin: KafkaAdminClient, topic_name: str) -> None:
         logger.warning(f"Ignoring topic deletion issue for '{topic_name}': {e}")
 
 
-def create_kafka_topic(topic_name, group_id=None) -> None:
+def create_kafka_topic(
+    topic_name, group_id=None, num_partitions: int = 1, recreate: bool = True
+) -> None:
     """
     Create a fresh Kafka topic with the given name.
     If it already exists, delete and recreate it (simple reset; no retention tweaks).
@@ -149,6 +203,11 @@ def create_kafka_topic(topic_name, group_id=None) -> None:
     Args:
         topic_name (str): Name of the Kafka topic.
         group_id (str|None): Unused (kept for signature compatibility).
+        num_partitions (int): Number of partitions; more partitions let
+            consumers in the same group share the load. Defaults to 1.
+        recreate (bool): If False, keep an existing topic that already has
+            num_partitions partitions (and its data) instead of resetting it.
+            Defaults to True.
     """
     kafka_broker = get_kafka_broker_address()
     admin_client = None
@@ -157,12 +216,24 @@ def create_kafka_topic(topic_name, group_id=None) -> None:
         admin_client = KafkaAdminClient(bootstrap_servers=kafka_broker)
 
         if _topic_exists(admin_client, topic_name):
+            if (
+                not recreate
+                and _topic_partition_count(admin_client, topic_name) == num_partitions
+            ):
+                logger.info(
+                    f"Topic '{topic_name}' already exists with {num_partitions} partition(s). Keeping it."
+                )
+                return
             logger.info(f"Topic '{topic_name}' already exists. Recreating fresh...")
             _delete_topic_if_exists(admin_client, topic_name)
 
-        new_topic = NewTopic(name=topic_name, num_partitions=1, replication_factor=1)
+        new_topic = NewTopic(
+            name=topic_name, num_partitions=num_partitions, replication_factor=1
+        )
         admin_client.create_topics([new_topic])
-        logger.info(f"Topic '{topic_name}' created successfully.")
+        logger.info(
+            f"Topic '{topic_name}' created successfully with {num_partitions} partition(s)."
+        )
 
     except Exception as e:
         logger.error(f"Error managing topic '{topic_name}': {e}")